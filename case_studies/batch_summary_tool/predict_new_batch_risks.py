@@ -15,10 +15,46 @@ Author: Josh Villanueva
 '''
 
 import os
+import json
+import functools
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Plots are only saved to file; skip GUI backend setup
 import matplotlib.pyplot as plt
 import joblib
+from sklearn.preprocessing import StandardScaler
+
+# ============================================
+# File locations
+# ============================================
+# ===== USER: Update base folder for your setup
+BASE_DIR = r'C:\path\to\your\batch_summary_tool'
+TEST_DIR = os.path.join(BASE_DIR, 'test_data')
+OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
+
+# Paths are fixed for the life of the process, so join them once at import
+BATCH_PATH = os.path.join(TEST_DIR, 'Test_Batch_Log.csv')
+COA_PATH = os.path.join(TEST_DIR, 'Test_COA_Data.csv')
+GMM_PATH = os.path.join(OUTPUT_DIR, 'risk_model_gmm.pkl')
+LOGREG_PATH = os.path.join(OUTPUT_DIR, 'risk_model_logreg.pkl')
+CLUSTER_MAP_PATH = os.path.join(OUTPUT_DIR, 'gmm_cluster_map.json')
+HISTORY_LOG_PATH = os.path.join(OUTPUT_DIR, 'batch_history_log.csv')
+
+# ============================================
+# Function: Parse CSV (pyarrow if available)
+# ============================================
+def _read_csv(file_path):
+    '''
+    Read a test input or the history log, with 'date' left as the string written in the file.
+    '''
+    dtype = {'date': str}  # Not applied to the COA file, which has no date column
+    try:
+        # Threaded pyarrow parse when available
+        return pd.read_csv(file_path, engine='pyarrow', dtype=dtype)
+    except (ImportError, ValueError):
+        # Default parser if pyarrow is absent or cannot read the file
+        return pd.read_csv(file_path, dtype=dtype)
 
 # ============================================
 # Function: Load CSV file
@@ -28,7 +64,7 @@ def load_csv_file(file_path, file_type='generic'):
     Load a CSV file into a DataFrame.
     '''
     try:
-        df = pd.read_csv(file_path)
+        df = _read_csv(file_path)
         print(f"Loaded {file_type}: {df.shape[0]} rows")
         return df
     except Exception as e:
@@ -41,19 +77,63 @@ def load_csv_file(file_path, file_type='generic'):
 def merge_new_data(batch_df, coa_df):
     '''
     Join batch log with COA details using shared supplier_lot key.
+
+    Exact duplicate COA rows are dropped first so a lot listed twice
+    does not duplicate its batches in the scored output.
     '''
     try:
-        df = pd.merge(batch_df, coa_df, on='supplier_lot', how='left')
+        coa_by_lot = coa_df.drop_duplicates().set_index('supplier_lot')
+        # Shared non-key columns get pd.merge's default _x/_y suffixes
+        df = batch_df.join(coa_by_lot, on='supplier_lot', how='left',
+                           lsuffix='_x', rsuffix='_y', validate='many_to_one')
         print(f"Merged test data shape: {df.shape}")
         return df
     except Exception as e:
         print(f"Merge error: {e}")
         return pd.DataFrame()
 
+# ============================================
+# Function: Build model input matrix
+# ============================================
+def _feature_matrix(df, features):
+    '''
+    Return df[features] as a contiguous float64 array (avoids per-call dtype coercion).
+    '''
+    return np.ascontiguousarray(df[features].to_numpy(dtype=np.float64))
+
+# ============================================
+# Function: Fast GMM cluster assignment
+# ============================================
+@functools.lru_cache(maxsize=8)
+def _gmm_predict_params(model):
+    '''
+    Precompute the per-component terms of a fitted full-covariance GMM.
+    Cached per model object, which _load_model reuses across runs.
+    '''
+    prec_chol = model.precisions_cholesky_                         # (k, d, d)
+    mean_proj = np.einsum('kd,kde->ke', model.means_, prec_chol)   # (k, d)
+    log_det = np.log(np.diagonal(prec_chol, axis1=1, axis2=2)).sum(axis=1)
+    return prec_chol, mean_proj, log_det + np.log(model.weights_)
+
+def _gmm_predict(model, X_scaled):
+    '''
+    Same result as model.predict(X_scaled), computed with two einsums.
+
+    Picks the component with the highest weighted log-likelihood; the shared
+    -0.5 * d * log(2π) term is dropped since it does not change the argmax.
+    Non-'full' covariance types fall back to sklearn.
+    '''
+    if model.covariance_type != 'full':
+        return model.predict(X_scaled)
+
+    prec_chol, mean_proj, offset = _gmm_predict_params(model)
+    y = np.einsum('nd,kde->nke', X_scaled, prec_chol) - mean_proj  # Whitened distance to each mean
+    return np.argmax(offset - 0.5 * np.einsum('nke,nke->nk', y, y), axis=1)
+
 # ============================================
 # Function: Apply risk models to new data
 # ============================================
-def apply_models(df, model_dict, features, method_label, flag_threshold=0.5, cluster_map=None):
+def apply_models(df, model_dict, features, method_label, flag_threshold=0.5, cluster_map=None, X=None):
     '''
     Predict P(failure) using a trained model and scaler.
 
@@ -63,22 +143,37 @@ def apply_models(df, model_dict, features, method_label, flag_threshold=0.5, clu
         features (list): Input features for prediction
         method_label (str): Prefix to store results (e.g., 'gmm', 'logreg')
         cluster_map (dict): Optional – mapping of GMM cluster IDs to failure probabilities
+        X (np.ndarray): Optional – unscaled df[features] as a float array, built once
+                        by the caller when scoring the same rows with several models
 
     Adds:
         df[f'{method_label}_p_failure']
         df[f'{method_label}_risk_flag']
     '''
     try:
-        X = df[features]
-        X_scaled = model_dict['scaler'].transform(X)
+        if X is None:
+            X = _feature_matrix(df, features)
+
+        scaler = model_dict['scaler']
+        if isinstance(scaler, StandardScaler) and scaler.with_mean and scaler.with_std:
+            # A full StandardScaler is just (x - mean) / scale; apply it directly
+            X_scaled = (X - scaler.mean_) / scaler.scale_
+        elif hasattr(scaler, 'feature_names_in_'):
+            X_scaled = scaler.transform(df[features])  # Fitted on a DataFrame: keep column names
+        else:
+            X_scaled = scaler.transform(X)
         model = model_dict['model']
 
         if method_label == 'gmm':
-            cluster_id = model.predict(X_scaled)
+            cluster_id = _gmm_predict(model, X_scaled)
             df['gmm_cluster'] = cluster_id
 
             if cluster_map is not None:
-                df['gmm_p_failure'] = df['gmm_cluster'].map(cluster_map)
+                # Array lookup by cluster ID (unknown clusters stay NaN, as with .map)
+                risk_by_cluster = np.full(model.n_components, np.nan)
+                for k, p in cluster_map.items():
+                    risk_by_cluster[int(k)] = p
+                df['gmm_p_failure'] = risk_by_cluster[cluster_id]
             else:
                 raise ValueError("Missing cluster_map input for GMM model.")
 
@@ -94,36 +189,55 @@ def apply_models(df, model_dict, features, method_label, flag_threshold=0.5, clu
 
     return df
 
+# ============================================
+# Function: Read header of existing master log
+# ============================================
+@functools.lru_cache(maxsize=None)
+def _get_log_header(log_path):
+    '''
+    Return the column names of an existing log, reading only its header row.
+    Cached per path so repeat appends skip the file read entirely.
+    '''
+    return tuple(pd.read_csv(log_path, nrows=0).columns)
+
 # ============================================
 # Function: Append new data to master log
 # ============================================
 def append_to_log(df, log_path, features_to_log):
     '''
     Add newly scored batches to cumulative CSV.
+
+    Rows are appended in place rather than re-reading the whole history,
+    so each run only writes the new batches as the log grows.
     '''
     new_data = df[features_to_log]
     try:
-        if os.path.exists(log_path):
-            existing = pd.read_csv(log_path)
-            combined = pd.concat([existing, new_data], ignore_index=True)
+        if not os.path.exists(log_path):
+            new_data.to_csv(log_path, index=False)
+            _get_log_header.cache_clear()  # New file: drop any stale cached header
         else:
-            combined = new_data
-        combined.to_csv(log_path, index=False)
+            # Match the existing column order; raises if a logged column is missing
+            expected_cols = list(_get_log_header(log_path))
+            new_data[expected_cols].to_csv(log_path, mode='a', header=False, index=False)
         print("Updated master log.")
     except Exception as e:
         print(f"Write error: {e}")
 
-def plot_risk_trend(df, score_col, flag_col, output_path, threshold_line=None):
+def plot_risk_trend(df, score_col, flag_col, output_path, threshold_line=None, dpi=300):
     '''
     Plot time-series of risk scores with color-coded flags and optional threshold line.
+    dpi sets the saved PNG resolution (pixel count and render time grow with dpi²).
     '''
     try:
         df['date'] = pd.to_datetime(df['date'])
-        df.sort_values('date', inplace=True)
+        # Batches are scored in date order, so skip the sort when already ordered
+        if not df['date'].is_monotonic_increasing:
+            df.sort_values('date', inplace=True)
 
         colors = df[flag_col].map({True: 'red', False: 'blue'})
         plt.figure(figsize=(10, 6))
-        plt.scatter(df['date'], df[score_col], c=colors)
+        # Rasterize the point layer only; axes and text stay vector in PDF/SVG output
+        plt.scatter(df['date'], df[score_col], c=colors, rasterized=True)
 
         plt.xlabel('Date')
         plt.ylabel('Risk Score')
@@ -139,12 +253,35 @@ def plot_risk_trend(df, score_col, flag_col, output_path, threshold_line=None):
                      fontsize=8, color='black', va='bottom')
 
         plt.tight_layout()
-        plt.savefig(output_path, dpi=300)
+        plt.savefig(output_path, dpi=dpi)
         plt.close()
         print(f"Saved risk trend plot: {output_path}")
     except Exception as e:
         print(f"Trend plot failed: {e}")
 
+# ============================================
+# Function: Load saved model artifacts (cached)
+# ============================================
+@functools.lru_cache(maxsize=8)
+def _load_model(path, mtime):
+    '''
+    Unpickle a saved {'model', 'scaler'} dict.
+
+    Cached on (path, mtime): repeat scoring runs reuse the in-memory model,
+    and retraining (which rewrites the file) changes mtime and forces a reload.
+    '''
+    return joblib.load(path)
+
+@functools.lru_cache(maxsize=8)
+def _load_cluster_map(path, mtime):
+    '''
+    Read the GMM cluster → failure probability map with integer cluster keys.
+    Cached on (path, mtime) like _load_model.
+    '''
+    with open(path, 'r') as f:
+        raw_map = json.load(f)
+    return {int(k): v for k, v in raw_map.items()}
+
 # ============================================
 # Main Runner
 # ============================================
@@ -152,22 +289,17 @@ def main():
     '''
     Main execution block: load new batches, apply both models, export outputs.
 
-    Edit base_dir to match your file structure.
+    Edit BASE_DIR (top of file) to match your file structure.
     '''
-    # ===== USER: Update base folder for your setup
-    base_dir = r'C:\path\to\your\batch_summary_tool'
-    test_dir = os.path.join(base_dir, 'test_data')
-    output_dir = os.path.join(base_dir, 'output')
-
     # ===== USER: Update flag threshold for risk scoring
     flag_thresh = 0.6  # Threshold for risk flagging
 
-    # Load new batch and COA
-    batch_path = os.path.join(test_dir, 'Test_Batch_Log.csv')
-    coa_path = os.path.join(test_dir, 'Test_COA_Data.csv')
+    # ===== USER: Resolution of saved trend plots (300 for reports, 150 is plenty on screen)
+    plot_dpi = 150
 
-    batch_df = load_csv_file(batch_path, 'Test Batch Log')
-    coa_df = load_csv_file(coa_path, 'Test COA')
+    # Load new batch and COA
+    batch_df = load_csv_file(BATCH_PATH, 'Test Batch Log')
+    coa_df = load_csv_file(COA_PATH, 'Test COA')
     df = merge_new_data(batch_df, coa_df)
 
     if df.empty:
@@ -178,40 +310,36 @@ def main():
     features = ['component_A', 'avg_pH']
 
     # ===== Check that model files exist before loading
-    gmm_path = os.path.join(output_dir, 'risk_model_gmm.pkl')
-    logreg_path = os.path.join(output_dir, 'risk_model_logreg.pkl')
-    cluster_map_path = os.path.join(output_dir, 'gmm_cluster_map.json')
-
-    if not all(os.path.exists(p) for p in [gmm_path, logreg_path, cluster_map_path]):
+    # getmtime doubles as the existence check: one stat per file, and the
+    # mtimes are the cache keys for the loaders below
+    try:
+        gmm_mtime, logreg_mtime, cluster_map_mtime = (
+            os.path.getmtime(p) for p in (GMM_PATH, LOGREG_PATH, CLUSTER_MAP_PATH))
+    except OSError:
         print("Missing one or more required model files.")
         return
 
     # Load models and GMM cluster risk mapping
-    gmm_model = joblib.load(gmm_path)
-    logreg_model = joblib.load(logreg_path)
-
-    import json
-    with open(cluster_map_path, 'r') as f:
-        raw_map = json.load(f)
-        gmm_cluster_map = {int(k): v for k, v in raw_map.items()}
-
+    gmm_model = _load_model(GMM_PATH, gmm_mtime)
+    logreg_model = _load_model(LOGREG_PATH, logreg_mtime)
+    gmm_cluster_map = _load_cluster_map(CLUSTER_MAP_PATH, cluster_map_mtime)
 
-    # Predict risk using both models
-    df = apply_models(df, gmm_model, features, 'gmm', flag_threshold=flag_thresh, cluster_map=gmm_cluster_map)
-    df = apply_models(df, logreg_model, features,'logreg', flag_threshold=flag_thresh)
+    # Predict risk using both models (feature matrix is built once and shared)
+    X = _feature_matrix(df, features)
+    df = apply_models(df, gmm_model, features, 'gmm', flag_threshold=flag_thresh, cluster_map=gmm_cluster_map, X=X)
+    df = apply_models(df, logreg_model, features,'logreg', flag_threshold=flag_thresh, X=X)
 
     # Append to log
-    history_log = os.path.join(output_dir, 'batch_history_log.csv')
     log_cols = ['batch_id', 'date', 'component_A', 'avg_pH',
                 'gmm_p_failure', 'gmm_risk_flag',
                 'logreg_p_failure', 'logreg_risk_flag']
-    append_to_log(df, history_log, log_cols)
+    append_to_log(df, HISTORY_LOG_PATH, log_cols)
 
     # Save plots
     plot_risk_trend(df, 'gmm_p_failure', 'gmm_risk_flag',
-                    os.path.join(output_dir, 'risk_trend_gmm.png'), threshold_line=flag_thresh)
+                    os.path.join(OUTPUT_DIR, 'risk_trend_gmm.png'), threshold_line=flag_thresh, dpi=plot_dpi)
     plot_risk_trend(df, 'logreg_p_failure', 'logreg_risk_flag',
-                    os.path.join(output_dir, 'risk_trend_logreg.png'), threshold_line=flag_thresh)
+                    os.path.join(OUTPUT_DIR, 'risk_trend_logreg.png'), threshold_line=flag_thresh, dpi=plot_dpi)
 
     print("Risk scoring complete.")
 
@@ -22,18 +22,35 @@ import numpy as np
 import matplotlib.pyplot as plt
 from sklearn.mixture import GaussianMixture
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import roc_auc_score, accuracy_score
+from sklearn.metrics import accuracy_score
 from sklearn.preprocessing import StandardScaler
+from sklearn.pipeline import make_pipeline
+from scipy.stats import rankdata  # scipy is installed with scikit-learn
 import joblib
 import json
 
+# ============================================
+# Function: Parse CSV (pyarrow if available)
+# ============================================
+def _read_csv(file_path):
+    '''
+    Read a training CSV (pyarrow if installed), keeping the batch log's 'date' as text.
+    '''
+    dtype = {'date': str}  # pyarrow would parse ISO dates; the QC and COA files have no date
+    try:
+        # pyarrow parses the file on several threads
+        return pd.read_csv(file_path, engine='pyarrow', dtype=dtype)
+    except (ImportError, ValueError):
+        # No pyarrow, or a file its stricter parser rejects
+        return pd.read_csv(file_path, dtype=dtype)
+
 # ============================================
 # Function: Load CSV file into DataFrame
 # Tip: Use this for loading batch logs, QC data, and COA files
 # ============================================
 def load_csv(file_path, label):
     try:
-        df = pd.read_csv(file_path)
+        df = _read_csv(file_path)
         print(f"Loaded {label}: {df.shape[0]} rows")
         return df
     except Exception as e:
@@ -45,8 +62,13 @@ def load_csv(file_path, label):
 # ============================================
 def merge_data(batch_df, qc_df, coa_df):
     try:
-        df = pd.merge(batch_df, qc_df, on='batch_id', how='inner')
-        df = pd.merge(df, coa_df, on='supplier_lot', how='left')
+        # Index the lookup tables by their key so each join probes a prebuilt index.
+        # validate= raises if QC has repeat batch_ids or COA has repeat supplier_lots.
+        # Shared non-key columns get pd.merge's default _x/_y suffixes.
+        df = batch_df.join(qc_df.set_index('batch_id'), on='batch_id', how='inner',
+                           lsuffix='_x', rsuffix='_y', validate='one_to_one')
+        df = df.join(coa_df.set_index('supplier_lot'), on='supplier_lot', how='left',
+                     lsuffix='_x', rsuffix='_y', validate='many_to_one')
         print(f"Merged data shape: {df.shape}")
         return df
     except Exception as e:
@@ -57,7 +79,9 @@ def merge_data(batch_df, qc_df, coa_df):
 # Function: Train GMM and return failure probabilities
 # ============================================
 def train_gmm(df, features, viability_threshold, viability_col='viability_pct'):
-    X = df[features].copy()
+    # Plain contiguous float32 array: no DataFrame copy, and half the bytes through scaler and EM.
+    # Single precision is ample for process measurements and 2-decimal risk scores.
+    X = np.ascontiguousarray(df[features].to_numpy(dtype=np.float32))
     scaler = StandardScaler()  # Scales features to mean=0, std=1 (important for models like GMM and Logistic Regression)
     X_scaled = scaler.fit_transform(X)
 
@@ -65,14 +89,41 @@ def train_gmm(df, features, viability_threshold, viability_col='viability_pct'):
     cluster_ids = gmm.fit_predict(X_scaled)
     df['gmm_cluster'] = cluster_ids
 
-    # Estimate cluster-wise failure probability
-    df['gmm_p_failure'] = df.groupby('gmm_cluster')[viability_col].transform(lambda x: (x < viability_threshold).mean())
+    # Estimate cluster-wise failure probability with two bincounts (fail count / batch count)
+    # instead of a Python lambda per group
+    # The threshold comparison is done once and feeds both the per-row and per-cluster results
+    fail = df[viability_col].to_numpy() < viability_threshold
+    num = np.bincount(cluster_ids, weights=fail, minlength=gmm.n_components)
+    den = np.bincount(cluster_ids, minlength=gmm.n_components)
+    p_by_cluster = num / np.maximum(den, 1)  # Empty clusters: avoid 0/0
+    df['gmm_p_failure'] = p_by_cluster[cluster_ids]
 
-    # Save cluster → failure probability mapping
-    cluster_map = df.groupby('gmm_cluster')[viability_col].apply(lambda x: (x < viability_threshold).mean()).to_dict()
+    # Save cluster → failure probability mapping (populated clusters only, plain
+    # int/float so it serializes to JSON as-is)
+    cluster_map = {int(i): float(p_by_cluster[i]) for i in np.flatnonzero(den)}
 
     return gmm, scaler, df, cluster_map
 
+# ============================================
+# Function: ROC AUC from score ranks
+# ============================================
+def _roc_auc(y, score):
+    '''
+    Binary ROC AUC via the Mann–Whitney U statistic (same value as roc_auc_score).
+
+    AUC is the chance a random failure scores above a random pass, which is
+    the rank sum of the positives with its minimum subtracted, normalized by
+    n_pos * n_neg. Tied scores get average ranks, which counts ties as 1/2.
+    '''
+    pos = y == 1
+    n_pos = np.count_nonzero(pos)
+    n_neg = y.size - n_pos
+    if n_pos == 0 or n_neg == 0:
+        raise ValueError("Only one class present in y; ROC AUC is not defined.")
+
+    ranks = rankdata(score)
+    return (ranks[pos].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
 # ============================================
 # Function: Train Logistic Regression model
 # ============================================
@@ -89,29 +140,39 @@ def train_logistic(df, features, viability_threshold, viability_col='viability_p
     Returns:
         model, scaler, df, auc, accuracy
     """
-    df['label'] = (df[viability_col] < viability_threshold).astype(int)
-    X = df[features]
-    y = df['label']
-
-    scaler = StandardScaler()  # Scales features to mean=0, std=1 (important for models like GMM and Logistic Regression)
-    X_scaled = scaler.fit_transform(X)
-
-    model = LogisticRegression()  # Can adjust with class_weight='balanced' if your dataset is imbalanced
-    model.fit(X_scaled, y)
+    # Build feature matrix (float32, as in train_gmm) and labels as arrays once;
+    # reused for fit, AUC, and accuracy
+    X = np.ascontiguousarray(df[features].to_numpy(dtype=np.float32))
+    y = (df[viability_col].to_numpy() < viability_threshold).astype(np.int8)  # 1 byte per row; 0/1 needs no more
+
+    # Fit scaler and model in one pipeline; scaling happens inside fit/predict,
+    # so no separate scaled copy of X is kept around
+    pipe = make_pipeline(
+        StandardScaler(),     # Scales features to mean=0, std=1 (important for models like GMM and Logistic Regression)
+        LogisticRegression()  # Can adjust with class_weight='balanced' if your dataset is imbalanced
+    )
+    pipe.fit(X, y)
+
+    y_prob = pipe.predict_proba(X)[:, 1]
+
+    auc = _roc_auc(y, y_prob)
+    # Class predictions from the same probabilities (predict() is P > 0.5), no second pass
+    y_pred = (y_prob > 0.5).astype(np.int8)
+    acc = accuracy_score(y, y_pred)
+    print(f"Logistic Model – AUC: {auc:.2f}, Accuracy: {acc:.2f}")
 
-    y_prob = model.predict_proba(X_scaled)[:, 1]
+    # Write results back to the DataFrame once, at the end
+    df['label'] = y
     df['logreg_p_failure'] = y_prob
 
-    auc = roc_auc_score(y, y_prob)
-    acc = accuracy_score(y, model.predict(X_scaled))
-    print(f"Logistic Model – AUC: {auc:.2f}, Accuracy: {acc:.2f}")
-
+    # Return the fitted steps separately so saved artifacts keep the {'model', 'scaler'} layout
+    scaler, model = pipe[0], pipe[-1]
     return model, scaler, df, auc, acc
 
 # ============================================
 # Function: Plot model comparison and viability map
 # ============================================
-def plot_models(df, features, output_dir, logreg_model=None):
+def plot_models(df, features, output_dir, logreg_model=None, dpi=300):
     import os
     import numpy as np
     import matplotlib.pyplot as plt
@@ -122,8 +183,13 @@ def plot_models(df, features, output_dir, logreg_model=None):
 
     fig, axes = plt.subplots(1, 3, figsize=(18, 5), sharex=True, sharey=True)
 
+    # Point layers are rasterized so large batch histories stay light in PDF/SVG;
+    # axes, labels, and colorbars remain vector. Markers are drawn without edge
+    # strokes, which otherwise add a stroked path per point.
+
     # --- Viability Percentage Plot ---
-    sc0 = axes[0].scatter(df[x], df[y], c=df['viability_pct'], cmap=cmap_viab, edgecolor='k')
+    sc0 = axes[0].scatter(df[x], df[y], c=df['viability_pct'], cmap=cmap_viab,
+                          edgecolors='none', linewidths=0, rasterized=True)
     axes[0].set_title('Viability %')
     axes[0].set_xlabel(x)
     axes[0].set_ylabel(y)
@@ -131,7 +197,8 @@ def plot_models(df, features, output_dir, logreg_model=None):
     cbar0.set_label('Viability (%)')
 
     # --- GMM Predicted Failure Probability ---
-    sc1 = axes[1].scatter(df[x], df[y], c=df['gmm_p_failure'], cmap=cmap_risk, vmin=0, vmax=1, edgecolor='k')
+    sc1 = axes[1].scatter(df[x], df[y], c=df['gmm_p_failure'], cmap=cmap_risk, vmin=0, vmax=1,
+                          edgecolors='none', linewidths=0, rasterized=True)
     axes[1].set_title('GMM Risk (Unsupervised)')
     axes[1].set_xlabel(x)
     cbar1 = plt.colorbar(sc1, ax=axes[1])
@@ -148,7 +215,8 @@ def plot_models(df, features, output_dir, logreg_model=None):
                      bbox=dict(facecolor='white', edgecolor='gray', alpha=0.75))
 
     # --- Logistic Regression Failure Probability ---
-    sc2 = axes[2].scatter(df[x], df[y], c=df['logreg_p_failure'], cmap=cmap_risk, vmin=0, vmax=1, edgecolor='k')
+    sc2 = axes[2].scatter(df[x], df[y], c=df['logreg_p_failure'], cmap=cmap_risk, vmin=0, vmax=1,
+                          edgecolors='none', linewidths=0, rasterized=True)
     axes[2].set_title('Logistic Risk (Supervised)')
     axes[2].set_xlabel(x)
     cbar2 = plt.colorbar(sc2, ax=axes[2])
@@ -159,24 +227,32 @@ def plot_models(df, features, output_dir, logreg_model=None):
         model = logreg_model['model']
         scaler = logreg_model['scaler']
 
-        # Create a meshgrid across the feature space
+        # Plot region: data range plus a small margin
         x_min, x_max = df[x].min() - 0.05, df[x].max() + 0.05
         y_min, y_max = df[y].min() - 0.05, df[y].max() + 0.05
-        xx, yy = np.meshgrid(np.linspace(x_min, x_max, 300),
-                             np.linspace(y_min, y_max, 300))
-        grid = np.c_[xx.ravel(), yy.ravel()]
-        grid_scaled = scaler.transform(grid)
-        probs = model.predict_proba(grid_scaled)[:, 1].reshape(xx.shape)
+
+        # P=0.5 is where w·z + b = 0 on scaled features z = (v - mean) / scale.
+        # Fold the scaler into the weights to get the same line in raw units,
+        # so the boundary is solved directly instead of evaluated on a grid.
+        coef = model.coef_[0]
+        w = coef / scaler.scale_
+        b = model.intercept_[0] - np.sum(coef * scaler.mean_ / scaler.scale_)
 
         # Draw the 0.5 decision boundary
-        contour = axes[2].contour(xx, yy, probs, levels=[0.5], colors='black', linewidths=1.5)
-        contour.collections[0].set_label('Decision Boundary (P=0.5)')
+        line_kw = dict(color='black', linewidth=1.5, label='Decision Boundary (P=0.5)')
+        if w[1] != 0:
+            xs = np.array([x_min, x_max])
+            axes[2].plot(xs, -(w[0] * xs + b) / w[1], scalex=False, scaley=False, **line_kw)
+        elif w[0] != 0:
+            axes[2].axvline(-b / w[0], **line_kw)  # Boundary does not depend on y
+        axes[2].set_xlim(x_min, x_max)
+        axes[2].set_ylim(y_min, y_max)
         axes[2].legend(loc='upper right')
 
     # Save and clean up
     plt.tight_layout()
     out_path = os.path.join(output_dir, 'model_comparison.png')
-    plt.savefig(out_path, dpi=300)
+    plt.savefig(out_path, dpi=dpi)
     plt.close()
     print(f"Model comparison plot saved to: {out_path}")
 
@@ -237,6 +313,9 @@ def main():
     # ===== USER: Modify these if using different features
     features = ['component_A', 'avg_pH']
 
+    # ===== USER: Resolution of the saved comparison plot (300 for reports, 150 is plenty on screen)
+    plot_dpi = 150
+
     # Train GMM model and extract cluster risk mapping
     gmm, gmm_scaler, merged, cluster_map = train_gmm(merged, features, viability_threshold)
 
@@ -244,7 +323,7 @@ def main():
     logreg, logreg_scaler, merged, auc, acc = train_logistic(merged, features, viability_threshold)
 
     # Plot comparison and save outputs
-    plot_models(merged, features, out_dir, logreg_model={'model': logreg, 'scaler': logreg_scaler})
+    plot_models(merged, features, out_dir, logreg_model={'model': logreg, 'scaler': logreg_scaler}, dpi=plot_dpi)
     save_artifacts(gmm, gmm_scaler, logreg, logreg_scaler, features, auc, acc, out_dir, cluster_map)
 
     print("Risk logic generation complete.")
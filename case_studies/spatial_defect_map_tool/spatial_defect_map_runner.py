@@ -12,8 +12,24 @@ Author: Josh Villanueva
 '''
 
 import os
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.lines import Line2D
+
+# ============================================
+# Function: Parse CSV (pyarrow if available)
+# ============================================
+def _read_csv(file_path):
+    '''
+    Read the defect CSV (x, y, type, severity; no dates to re-type) with pyarrow when available.
+    '''
+    try:
+        # pyarrow splits the file into blocks and parses them on several threads
+        return pd.read_csv(file_path, engine='pyarrow')
+    except (ImportError, ValueError):
+        # Default parser when pyarrow is not installed or rejects the file
+        return pd.read_csv(file_path)
 
 # ============================================
 # Function: Load defect data from CSV
@@ -31,7 +47,7 @@ def load_defect_data(file_path):
     MATLAB analogy:
         >> T = readtable('example_defects.csv');
     '''
-    df = pd.read_csv(file_path)
+    df = _read_csv(file_path)
     required_cols = {'x', 'y', 'type', 'severity'}
     if not required_cols.issubset(df.columns):
         raise ValueError(f'Missing required columns: {required_cols - set(df.columns)}')
@@ -41,33 +57,50 @@ def load_defect_data(file_path):
 # Function: Plot and save spatial defect map
 # ============================================
 
-def plot_defect_map(df, output_path):
+def plot_defect_map(df, output_path, dpi=300):
     '''
     Generate a 2D spatial defect map (scatter plot) color-coded by type.
 
     Args:
         df (pd.DataFrame): DataFrame with x, y, type, severity columns.
         output_path (str): File path to save the PNG plot.
+        dpi (int): Resolution of the saved PNG.
 
     MATLAB analogy:
         >> gscatter(x, y, type);
     '''
+    # Encode each defect type as an integer code (in order of first appearance)
+    codes, defect_types = pd.factorize(df['type'])
+
+    # Use the default color cycle so each type keeps the color it would get
+    # from one scatter call per type, but draw all points as one collection
+    palette = np.array(plt.rcParams['axes.prop_cycle'].by_key()['color'])
+    colors = palette[codes % len(palette)]
+
     plt.figure(figsize=(8, 6))
-    for defect_type in df['type'].unique():
-        subset = df[df['type'] == defect_type]
-        plt.scatter(
-            subset['x'], subset['y'],
-            label=defect_type,
-            alpha=0.7,
-            s=80
-        )
+    plt.scatter(
+        df['x'], df['y'],
+        c=colors,
+        alpha=0.7,
+        s=80,
+        linewidths=0,    # Fill only; no per-point edge stroke
+        rasterized=True  # Keep axes/legend vector but draw points as an image layer
+    )
+
+    # Single scatter has no per-type labels, so build the legend entries directly
+    handles = [
+        Line2D([0], [0], marker='o', linestyle='', markersize=9, alpha=0.7,
+               color=palette[i % len(palette)], label=defect_type)
+        for i, defect_type in enumerate(defect_types)
+    ]
+
     plt.xlabel('X Position')
     plt.ylabel('Y Position')
     plt.title('Spatial Defect Map')
     plt.grid(True, linestyle='--', alpha=0.3)
-    plt.legend(title='Defect Type')
+    plt.legend(handles=handles, title='Defect Type')
     plt.tight_layout()
-    plt.savefig(output_path, dpi=300)
+    plt.savefig(output_path, dpi=dpi)
     plt.close()
 
 # ============================================
@@ -83,6 +116,7 @@ def main():
     # Example: input_csv = r'C:\path\to\your\defect_data.csv'
     input_csv = 'example_defects.csv'
     output_png = 'spatial_defect_map.png'
+    plot_dpi = 150  # Use 300 for report-quality images
 
     # Get the directory where this script is located
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -93,7 +127,7 @@ def main():
 
     # Run defect mapping pipeline
     df = load_defect_data(csv_path)
-    plot_defect_map(df, plot_path)
+    plot_defect_map(df, plot_path, dpi=plot_dpi)
 
     # Print status to console
     print(f'Spatial defect map saved to: {plot_path}')
@@ -12,10 +12,26 @@ Author: Josh Villanueva
 '''
 
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Charts are only saved to file; skip GUI backend setup
 import matplotlib.pyplot as plt
 import numpy as np
 import os
 
+# ============================================
+# Function: Parse CSV (pyarrow if available)
+# ============================================
+def _read_csv(file_path, usecols=None):
+    '''
+    Read only the usecols metric column(s) of a CSV, with pyarrow when available.
+    '''
+    try:
+        # Threaded parse straight into a float column
+        return pd.read_csv(file_path, engine='pyarrow', usecols=usecols)
+    except (ImportError, ValueError):
+        # pyarrow missing, or file too irregular for its stricter parser
+        return pd.read_csv(file_path, usecols=usecols)
+
 # ============================================
 # Load Data Function
 # ============================================
@@ -30,10 +46,15 @@ def load_data(file_path, value_column):
     Returns:
     - pd.Series: The column of interest as a pandas Series
     '''
+    # Only the value column is parsed; other columns are skipped at read time
     if file_path.endswith('.csv'):
-        df = pd.read_csv(file_path)
+        # Check the header row alone first so a bad column name fails before a full parse
+        if value_column not in pd.read_csv(file_path, nrows=0).columns:
+            raise ValueError(f"Column '{value_column}' not found in file.")
+        df = _read_csv(file_path, usecols=[value_column])
     elif file_path.endswith(('.xls', '.xlsx')):
-        df = pd.read_excel(file_path)
+        # Callable usecols yields an empty frame (not an error) if the column is missing
+        df = pd.read_excel(file_path, usecols=lambda col: col == value_column)
     else:
         raise ValueError("Unsupported file format. Use CSV or Excel.")
 
@@ -55,8 +76,17 @@ def compute_spc_metrics(data):
     Returns:
     - dict: Summary statistics
     '''
-    mean = data.mean()
-    std = data.std()
+    # Strip missing readings first so the reductions below see only real measurements
+    values = data.to_numpy(dtype=np.float64)
+    values = values[~np.isnan(values)]
+    n = values.size
+    if n == 0:
+        # Nothing measurable (empty or all-NaN column): NaN for every metric
+        return dict.fromkeys(['mean', 'std', 'min', 'max', 'UCL', 'LCL'], np.nan)
+
+    mean = values.mean()
+    dev = values - mean
+    std = np.sqrt(dev @ dev / (n - 1)) if n > 1 else np.nan  # ddof=1 sample std; NaN below two readings
     ucl = mean + 3 * std  # Upper Control Limit
     lcl = mean - 3 * std  # Lower Control Limit
 
@@ -66,8 +96,8 @@ def compute_spc_metrics(data):
     stats = {
         'mean': mean,
         'std': std,
-        'min': data.min(),
-        'max': data.max(),
+        'min': values.min(),
+        'max': values.max(),
         'UCL': ucl,
         'LCL': lcl
     }
@@ -88,18 +118,27 @@ def detect_outliers(data, method='zscore', threshold=3.0):
     Returns:
     - pd.Series (bool): True where data is an outlier
     '''
+    # Work on one float array; each step below is a single vectorized NumPy operation
+    values = data.to_numpy(dtype=np.float64)
+    valid = values[~np.isnan(values)]  # NaN-free values for the statistics; NaN rows are never flagged
+
+    if method not in ('zscore', 'iqr'):
+        raise ValueError("Invalid method. Choose 'zscore' or 'iqr'.")
+
+    # Too few values for a std (zscore) or any quartile (iqr): nothing can be flagged
+    if valid.size < (2 if method == 'zscore' else 1):
+        return pd.Series(False, index=data.index)
+
     if method == 'zscore':
-        z_scores = (data - data.mean()) / data.std()
-        return abs(z_scores) > threshold
+        # |x - mean| > threshold * std is |z| > threshold without the divide
+        mask = np.abs(values - valid.mean()) > threshold * valid.std(ddof=1)
 
-    elif method == 'iqr':
-        Q1 = data.quantile(0.25)
-        Q3 = data.quantile(0.75)
+    else:  # iqr
+        Q1, Q3 = np.quantile(valid, [0.25, 0.75])  # One call for both quantiles
         IQR = Q3 - Q1
-        return (data < Q1 - threshold * IQR) | (data > Q3 + threshold * IQR)
+        mask = (values < Q1 - threshold * IQR) | (values > Q3 + threshold * IQR)
 
-    else:
-        raise ValueError("Invalid method. Choose 'zscore' or 'iqr'.")
+    return pd.Series(mask, index=data.index)
 
 # ============================================
 # Plot Control Chart
@@ -115,7 +154,8 @@ def plot_control_chart(data, stats, outliers=None, output_path='output_chart.png
     - output_path (str): Path to save the output chart
     '''
     plt.figure(figsize=(12, 6))
-    plt.plot(data.index, data.values, marker='o', label='Data')
+    # Data markers are rasterized so long runs save quickly; limits, text, and axes stay vector
+    plt.plot(data.index, data.values, marker='o', label='Data', rasterized=True)
 
     # Plot control limits and mean
     plt.axhline(stats['mean'], color='green', linestyle='--', label='Mean')
@@ -124,7 +164,8 @@ def plot_control_chart(data, stats, outliers=None, output_path='output_chart.png
 
     # Highlight outliers
     if outliers is not None:
-        plt.scatter(data.index[outliers], data[outliers], color='red', zorder=5, label='Outliers')
+        plt.scatter(data.index[outliers], data[outliers], color='red', zorder=5, label='Outliers',
+                    rasterized=True)
 
     plt.title('SPC Control Chart')
     plt.xlabel('Sample Index')
@@ -138,20 +179,27 @@ def plot_control_chart(data, stats, outliers=None, output_path='output_chart.png
 # ============================================
 # Save Flagged Data
 # ============================================
-def save_flagged_data(data, outliers, output_path='flagged_data.csv'):
+def save_flagged_data(data, outliers, output_path='flagged_data.csv', float_format=None):
     '''
     Export original data with an added outlier flag column.
 
     Parameters:
     - data (pd.Series): Original numeric data
     - outliers (pd.Series): Boolean mask for outliers
-    - output_path (str): Path to save output CSV
+    - output_path (str): Path to save output CSV (or .parquet, requires pyarrow)
+    - float_format (str): Optional CSV float format, e.g. '%.6g' for compact, faster output
     '''
+    # data and outliers come from the same Series index (see detect_outliers), so wrap
+    # the raw arrays directly and skip index alignment; the index is not written anyway
     df = pd.DataFrame({
-        'Value': data,
-        'Outlier': outliers
+        'Value': np.asarray(data),
+        'Outlier': np.asarray(outliers, dtype=bool)
     })
-    df.to_csv(output_path, index=False)
+    if output_path.endswith('.parquet'):
+        df.to_parquet(output_path, index=False, compression='zstd')  # Compact, fast to re-read
+    else:
+        # Full precision by default; '\n' line endings keep the output identical across platforms
+        df.to_csv(output_path, index=False, float_format=float_format, lineterminator='\n')
 
 # ============================================
 # Main Runner
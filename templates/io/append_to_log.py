@@ -4,25 +4,35 @@ append_to_log.py
 Append new rows to a cumulative CSV file (e.g., for batch history tracking).
 
 Typical use case: Extend a master log with risk-scored batch records after model application.
-If the file does not exist, it will be created. Otherwise, the new rows are appended.
+If the file does not exist, it will be created. Otherwise, the new rows are appended
+in place, so the existing history is never re-read or rewritten.
+
+If log_path ends in .parquet, the log is instead a folder of Parquet part files:
+each append adds one new file (requires pyarrow), and pd.read_parquet(log_path)
+reads the whole history back.
 
 Author: Josh Villanueva
 '''
 
 import pandas as pd
 import os
+import time
+import uuid
 
 # ============================================
 # Function: Append new rows to a cumulative CSV log
 # ============================================
-def append_to_log(df, log_path, features_to_log):
+def append_to_log(df, log_path, features_to_log, float_format=None):
     '''
     Add selected columns from a DataFrame to a persistent CSV log.
 
     Parameters:
     - df (pd.DataFrame): DataFrame containing new data to log
     - log_path (str): Full file path to the existing or new CSV file
+                      (or a .parquet folder path for a Parquet dataset log)
     - features_to_log (list): List of column names to include in the log
+    - float_format (str): Optional CSV float format, e.g. '%.6g' for compact, faster output
+                          (default writes full precision; use the same format on every append)
 
     Returns:
     - None (writes combined log to disk)
@@ -31,15 +41,33 @@ def append_to_log(df, log_path, features_to_log):
     new_data = df[features_to_log]
 
     try:
-        # If log file exists, append; otherwise create new log
-        if os.path.exists(log_path):
-            existing = pd.read_csv(log_path)
-            combined = pd.concat([existing, new_data], ignore_index=True)
-        else:
-            combined = new_data
-
-        # Save updated log
-        combined.to_csv(log_path, index=False)
+        if log_path.endswith('.parquet'):
+            # Dataset log: "append" is a new part file, existing parts are never touched.
+            # Nanosecond time-stamped names keep the parts in write order when read back.
+            os.makedirs(log_path, exist_ok=True)
+            part_name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+            new_data.to_parquet(os.path.join(log_path, part_name), index=False)
+            print(f"Updated master log: {log_path}")
+            return
+
+        # Only write the header when creating a new log file
+        header_needed = not os.path.exists(log_path)
+
+        if not header_needed:
+            # Peek at the header row only (never the full log) so appended rows line up
+            log_cols = list(pd.read_csv(log_path, nrows=0).columns)
+            if set(log_cols) != set(new_data.columns):
+                raise ValueError(f"Columns {list(new_data.columns)} do not match existing log {log_cols}")
+            new_data = new_data[log_cols]  # Same columns, log's order
+
+        # Append new rows only; cost scales with len(new_data), not the log size
+        with open(log_path, 'a', newline='') as f:
+            # One line ending on every platform; floats at full precision unless asked otherwise
+            new_data.to_csv(f, header=header_needed, index=False,
+                            float_format=float_format, lineterminator='\n')
+            # Flush to disk so a crash mid-run cannot lose appended rows
+            f.flush()
+            os.fsync(f.fileno())
         print(f"Updated master log: {log_path}")
 
     except Exception as e:
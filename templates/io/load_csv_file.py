@@ -6,6 +6,14 @@ Reusable function to load CSV data into a pandas DataFrame with error handling.
 This I/O utility is designed to be dropped into any data processing script.
 Includes basic printout and fallback to empty DataFrame on failure.
 
+The default pandas parser is used unless engine='pyarrow' is passed. The
+multi-threaded pyarrow reader is faster on large files, but it infers its own
+column types: ISO date text (e.g. 2024-01-01) comes back as datetime.date
+objects and date-times as datetime64, where the default parser returns strings.
+Pin such columns with dtype (e.g. {'date': str}) when opting in.
+For files too large to hold in memory, pass chunksize to iterate over
+DataFrame pieces instead.
+
 Typical use cases:
 - Batch logs
 - Measurement outputs
@@ -16,28 +24,73 @@ Author: Josh Villanueva
 
 import pandas as pd
 
+# ============================================
+# Function: Read CSV file (no error handling)
+# ============================================
+def _load_csv_file_raw(file_path, usecols=None, chunksize=None, dtype=None, engine=None):
+    '''
+    Parse a CSV file into a DataFrame and let any error propagate.
+
+    Kept separate from load_csv_file so batch loops and profilers see the
+    real failure point instead of a caught-and-printed exception.
+    '''
+    if chunksize is not None:
+        # Chunked reading is a C-parser feature; pyarrow reads the whole file at once
+        return pd.read_csv(file_path, usecols=usecols, chunksize=chunksize, memory_map=True,
+                           dtype=dtype)
+
+    if engine == 'pyarrow':
+        try:
+            # Threaded parse; numeric columns never become Python objects
+            return pd.read_csv(file_path, engine='pyarrow', usecols=usecols, dtype=dtype)
+        except (ImportError, ValueError):
+            pass  # pyarrow missing, or file too irregular for its stricter parser
+
+    # Memory-map the file so the C parser reads pages without an extra copy
+    return pd.read_csv(file_path, usecols=usecols, memory_map=True, low_memory=False,
+                       dtype=dtype)
+
 # ============================================
 # Function: Load CSV file with error handling
 # ============================================
-def load_csv_file(file_path, file_type='generic'):
+def load_csv_file(file_path, file_type='generic', usecols=None, chunksize=None, dtype=None,
+                  engine=None):
     '''
     Load a CSV file into a DataFrame.
 
     Parameters:
     - file_path (str): Full path to the input CSV file
     - file_type (str): Optional label for console logging
+    - usecols (list): Optional subset of columns to parse (others are skipped at read time)
+    - chunksize (int): Optional rows per chunk; returns an iterator of DataFrames
+                       so peak memory is bounded by one chunk
+    - dtype (dict): Optional column types, e.g. {'date': str} to keep ISO dates as text
+                    (the pyarrow reader otherwise returns them as datetime.date objects)
+    - engine (str): 'pyarrow' for the faster threaded reader (falls back to the default
+                    parser if pyarrow is missing or rejects the file); ignored with chunksize
 
     Returns:
     - pd.DataFrame: Loaded DataFrame or empty fallback on failure
+      (an iterator of DataFrames when chunksize is given)
+
+    Example (chunked):
+        for chunk in load_csv_file('big_log.csv', 'Batch Log', chunksize=100_000):
+            process(chunk)  # Combine per-chunk results (counts, sums) across the loop
     '''
     try:
-        df = pd.read_csv(file_path)
-        print(f"Loaded {file_type}: {df.shape[0]} rows")
-        return df
+        df = _load_csv_file_raw(file_path, usecols=usecols, chunksize=chunksize, dtype=dtype,
+                                engine=engine)
     except Exception as e:
         print(f"Failed to load {file_type} file: {e}")
         return pd.DataFrame()
 
+    if chunksize is not None:
+        print(f"Opened {file_type} for reading in chunks of {chunksize} rows")
+        return df
+
+    print(f"Loaded {file_type}: {df.shape[0]} rows")
+    return df
+
 # ============================================
 # Optional Test Block
 # ============================================
@@ -5,6 +5,7 @@ Utility function to export a DataFrame to CSV with clean overwrite logic.
 
 Intended for use in batch scoring, SPC output, or defect mapping pipelines.
 Warns on overwrite and preserves index toggle flexibility.
+Paths ending in .parquet are written as compressed Parquet instead (requires pyarrow).
 
 Author: Josh Villanueva
 '''
@@ -15,15 +16,17 @@ import os
 # ============================================
 # Function: Save DataFrame to CSV file
 # ============================================
-def save_dataframe_to_csv(df, output_path, include_index=False, overwrite=True):
+def save_dataframe_to_csv(df, output_path, include_index=False, overwrite=True, float_format=None):
     '''
     Save a pandas DataFrame to a CSV file.
 
     Parameters:
     - df (pd.DataFrame): The DataFrame to export
-    - output_path (str): Full path to output CSV
+    - output_path (str): Full path to output CSV (or .parquet for a Parquet file)
     - include_index (bool): Whether to include the DataFrame index in output
     - overwrite (bool): Whether to overwrite existing files
+    - float_format (str): Optional CSV float format, e.g. '%.6g' for compact, faster output
+                          (default None keeps full precision)
 
     Returns:
     - None (writes file to disk)
@@ -33,7 +36,11 @@ def save_dataframe_to_csv(df, output_path, include_index=False, overwrite=True):
         return
 
     try:
-        df.to_csv(output_path, index=include_index)
+        if output_path.endswith('.parquet'):
+            # Columnar and zstd-compressed: faster to write and re-read than CSV, and smaller on disk
+            df.to_parquet(output_path, index=include_index, compression='zstd')
+        else:
+            df.to_csv(output_path, index=include_index, float_format=float_format, lineterminator='\n')
         print(f"Saved DataFrame to: {output_path}")
     except Exception as e:
         print(f"Failed to save DataFrame: {e}")
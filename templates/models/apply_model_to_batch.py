@@ -9,7 +9,46 @@ Intended for use in systems that need to assess batch risk before final QC resul
 Author: Josh Villanueva
 '''
 
+import numpy as np
 import pandas as pd
+from scipy.special import expit  # scipy is installed with scikit-learn
+from sklearn.preprocessing import StandardScaler
+
+# ============================================
+# Helpers: Scaling for float32 feature arrays
+# ============================================
+def _is_standard_scaler(scaler):
+    '''
+    True for a StandardScaler that both centers and scales, i.e. exactly
+    (x - mean_) / scale_. Only then can the scaling be applied by hand.
+    '''
+    return isinstance(scaler, StandardScaler) and scaler.with_mean and scaler.with_std
+
+def _scale(X, scaler, features):
+    '''
+    Scale X as scaler.transform would.
+
+    A full StandardScaler is applied directly as (x - mean) / scale, which skips
+    sklearn's input validation. Any other scaler goes through transform().
+    '''
+    if _is_standard_scaler(scaler):
+        return (X - scaler.mean_.astype(np.float32)) / scaler.scale_.astype(np.float32)
+    if hasattr(scaler, 'feature_names_in_'):
+        # Fitted on a DataFrame: pass column names too, or sklearn warns
+        return scaler.transform(pd.DataFrame(X, columns=features))
+    return scaler.transform(X)
+
+def _fold_scaler_into_linear(model, scaler):
+    '''
+    Return (w, b) so that X @ w + b equals model's score on scaled X.
+    scaler must be a full StandardScaler (see _is_standard_scaler).
+
+    w·((x - mean) / scale) + b0  ==  x·(w / scale) + (b0 - Σ w·mean / scale)
+    '''
+    coef = model.coef_[0]
+    w = coef / scaler.scale_
+    b = model.intercept_[0] - np.sum(coef * scaler.mean_ / scaler.scale_)
+    return w.astype(np.float32), float(b)
 
 # ============================================
 # Function: Apply model to new data and score risk
@@ -38,13 +77,15 @@ def apply_model_to_batch(df, model_dict, features, method_label,
     - Logistic regression outputs a direct probability of failure.
     '''
     try:
-        X = df[features]
-        X_scaled = model_dict['scaler'].transform(X)
+        # One contiguous float32 matrix: half the bytes of float64, no per-column coercion
+        X = np.ascontiguousarray(df[features].to_numpy(dtype=np.float32))
+
+        scaler = model_dict['scaler']
         model = model_dict['model']
 
         if method_label == 'gmm':
             # GMM: Predict cluster IDs from feature space
-            cluster_id = model.predict(X_scaled)
+            cluster_id = model.predict(_scale(X, scaler, features))
             df['gmm_cluster'] = cluster_id
 
             # Map cluster → risk probability
@@ -54,11 +95,19 @@ def apply_model_to_batch(df, model_dict, features, method_label,
                 raise ValueError("Missing cluster_map input for GMM model.")
 
         else:  # Supervised model like logistic regression
-            p_failure = model.predict_proba(X_scaled)[:, 1]
+            coef = getattr(model, 'coef_', None)
+            if coef is not None and coef.shape[0] == 1 and _is_standard_scaler(scaler):
+                # Binary linear model: fold the scaler into the weights so scoring is one
+                # matrix-vector product on raw X (no scaled copy, no (n, 2) proba matrix)
+                w, b = _fold_scaler_into_linear(model, scaler)
+                p_failure = expit(X @ w + b)
+            else:
+                p_failure = model.predict_proba(_scale(X, scaler, features))[:, 1]
             df[f'{method_label}_p_failure'] = p_failure
 
-        # Flag high-risk batches based on threshold
-        df[f'{method_label}_risk_flag'] = df[f'{method_label}_p_failure'] > flag_threshold
+        # Flag high-risk batches based on threshold (compared on the raw array)
+        p_col = df[f'{method_label}_p_failure'].to_numpy()
+        df[f'{method_label}_risk_flag'] = p_col > flag_threshold
 
     except Exception as e:
         print(f"Error in {method_label} prediction: {e}")
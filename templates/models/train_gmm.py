@@ -10,6 +10,7 @@ frequently each cluster is associated with a failing quality metric.
 Author: Josh Villanueva
 '''
 
+import numpy as np
 import pandas as pd
 from sklearn.mixture import GaussianMixture
 from sklearn.preprocessing import StandardScaler
@@ -55,17 +56,18 @@ def train_gmm(df, features, threshold, target_col, n_clusters=2):
     df['gmm_cluster'] = cluster_ids
 
     # Step 3: Estimate failure probability within each cluster
-    # This line computes the % of rows that failed in each cluster
-    # .transform() maps the result back to the same shape as the original DataFrame
-    df['gmm_p_failure'] = df.groupby('gmm_cluster')[target_col].transform(
-        lambda x: (x < threshold).mean()
-    )
+    # np.bincount counts rows per cluster ID; with weights=fail it counts failures instead.
+    # Failures / rows is each cluster's failure rate, with no per-group Python call.
+    fail = df[target_col].to_numpy() < threshold
+    n_fail = np.bincount(cluster_ids, weights=fail, minlength=n_clusters)
+    n_rows = np.bincount(cluster_ids, minlength=n_clusters)
+    p_by_cluster = n_fail / np.maximum(n_rows, 1)  # Empty clusters: avoid 0/0
+
+    # Indexing by cluster ID maps each row's cluster back to its failure rate
+    df['gmm_p_failure'] = p_by_cluster[cluster_ids]
 
-    # This line creates a dictionary with cluster_id as key and P(failure) as value
-    # .apply() computes once per group and returns a compact mapping
-    cluster_map = df.groupby('gmm_cluster')[target_col].apply(
-        lambda x: (x < threshold).mean()
-    ).to_dict()
+    # Dictionary with cluster_id as key and P(failure) as value (clusters that received rows)
+    cluster_map = {int(i): float(p_by_cluster[i]) for i in np.flatnonzero(n_rows)}
 
     return model, scaler, df, cluster_map
 
@@ -4,16 +4,41 @@ plot_control_chart.py
 Generate and save a simple control chart with mean and ±3σ control limits.
 Outliers can be highlighted based on a boolean Series.
 
+One figure is created on first use and cleared between calls, so scripts that
+chart many batches in a loop do not build and tear down a figure every time.
+
 Author: Josh Villanueva
 '''
 
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import pandas as pd
 
+# Reused across calls; created lazily by _get_axes()
+_FIG = None
+_AX = None
+
+# ============================================
+# Function: Get (or create) the reusable chart axes
+# ============================================
+def _get_axes():
+    '''
+    Return the shared figure and axes, cleared and ready to draw on.
+
+    A bare Figure (not plt.figure) is not tracked by pyplot, so it never
+    needs plt.close() and does not pile up across calls.
+    '''
+    global _FIG, _AX
+    if _FIG is None:
+        _FIG = Figure(figsize=(10, 5))
+        _AX = _FIG.add_subplot()
+    else:
+        _AX.clear()
+    return _FIG, _AX
+
 # ============================================
 # Function: Plot a control chart
 # ============================================
-def plot_control_chart(data, stats, outliers=None, output_path='control_chart.png'):
+def plot_control_chart(data, stats, outliers=None, output_path='control_chart.png', dpi=300):
     '''
     Create a control chart and save it as PNG.
 
@@ -22,25 +47,27 @@ def plot_control_chart(data, stats, outliers=None, output_path='control_chart.pn
     - stats (dict): Must include 'mean', 'UCL', 'LCL'
     - outliers (pd.Series): Boolean mask of same length as data (optional)
     - output_path (str): File path for saving the image
+    - dpi (int): Resolution of the saved image (100-150 is enough for screen use)
 
     Returns:
     - None (chart saved to file)
     '''
-    plt.figure(figsize=(10, 5))
-    plt.plot(data.index, data.values, marker='o', label='Data')
+    fig, ax = _get_axes()
+    # Data markers are rasterized so long runs save quickly; limits, text, and axes stay vector
+    ax.plot(data.index, data.values, marker='o', label='Data', rasterized=True)
 
-    plt.axhline(stats['mean'], color='green', linestyle='--', label='Mean')
-    plt.axhline(stats['UCL'], color='red', linestyle='--', label='UCL (+3σ)')
-    plt.axhline(stats['LCL'], color='red', linestyle='--', label='LCL (-3σ)')
+    ax.axhline(stats['mean'], color='green', linestyle='--', label='Mean')
+    ax.axhline(stats['UCL'], color='red', linestyle='--', label='UCL (+3σ)')
+    ax.axhline(stats['LCL'], color='red', linestyle='--', label='LCL (-3σ)')
 
     if outliers is not None:
-        plt.scatter(data.index[outliers], data[outliers], color='red', zorder=5, label='Outliers')
-
-    plt.title('Control Chart')
-    plt.xlabel('Index')
-    plt.ylabel('Value')
-    plt.grid(True, linestyle='--', alpha=0.3)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=300)
-    plt.close()
+        ax.scatter(data.index[outliers], data[outliers], color='red', zorder=5, label='Outliers',
+                   rasterized=True)
+
+    ax.set_title('Control Chart')
+    ax.set_xlabel('Index')
+    ax.set_ylabel('Value')
+    ax.grid(True, linestyle='--', alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=dpi)
@@ -7,6 +7,7 @@ Useful for tracking model outputs over time in manufacturing or MSAT settings.
 Author: Josh Villanueva
 '''
 
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
@@ -27,12 +28,19 @@ def plot_risk_trend(df, score_col, flag_col, output_path, threshold_line=None):
     Returns:
     - None (saves image)
     '''
-    df['date'] = pd.to_datetime(df['date'])
-    df.sort_values('date', inplace=True)
+    # Work on plain arrays so the caller's DataFrame is left unchanged
+    dates = pd.to_datetime(df['date'])
+    scores = df[score_col].to_numpy()
+    colors = np.where(df[flag_col].to_numpy(dtype=bool), 'red', 'blue')
+
+    # Batches are scored in date order, so skip the sort when already ordered
+    if not dates.is_monotonic_increasing:
+        order = np.argsort(dates.to_numpy(), kind='stable')
+        dates, scores, colors = dates.iloc[order], scores[order], colors[order]
 
-    colors = df[flag_col].map({True: 'red', False: 'blue'})
     plt.figure(figsize=(10, 6))
-    plt.scatter(df['date'], df[score_col], c=colors, alpha=0.8)
+    # Rasterize the point layer only; axes and text stay vector in PDF/SVG output
+    plt.scatter(dates, scores, c=colors, alpha=0.8, rasterized=True)
 
     plt.xlabel('Date')
     plt.ylabel('Risk Score')
@@ -42,7 +50,7 @@ def plot_risk_trend(df, score_col, flag_col, output_path, threshold_line=None):
 
     if threshold_line is not None:
         plt.axhline(y=threshold_line, color='black', linestyle=':', linewidth=1)
-        plt.text(df['date'].min(), threshold_line + 0.01,
+        plt.text(dates.min(), threshold_line + 0.01,
                  f'Threshold = {threshold_line:.2f}',
                  fontsize=8, color='black', va='bottom')
 
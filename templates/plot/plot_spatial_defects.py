@@ -7,7 +7,10 @@ Useful for wafer mapping, spatial clustering, and early triage.
 Author: Josh Villanueva
 '''
 
+import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.lines import Line2D
 
 # ============================================
 # Function: Plot spatial defect distribution
@@ -23,20 +26,34 @@ def plot_spatial_defects(df, output_path):
     Returns:
     - None (saves image)
     '''
+    # Encode each defect type as an integer code (in order of first appearance)
+    codes, defect_types = pd.factorize(df['type'])
+
+    # Same colors a per-type loop would get from the default cycle,
+    # but all points go into one scatter instead of one subset per type
+    palette = np.array(plt.rcParams['axes.prop_cycle'].by_key()['color'])
+    colors = palette[codes % len(palette)]
+
     plt.figure(figsize=(8, 6))
-    for defect_type in df['type'].unique():
-        subset = df[df['type'] == defect_type]
-        plt.scatter(
-            subset['x'], subset['y'],
-            label=defect_type,
-            alpha=0.7, s=80
-        )
+    plt.scatter(
+        df['x'].to_numpy(), df['y'].to_numpy(),
+        c=colors,
+        alpha=0.7, s=80,
+        rasterized=True  # Points as an image layer; axes and legend stay vector
+    )
+
+    # Single scatter has no per-type labels, so build the legend entries directly
+    handles = [
+        Line2D([0], [0], marker='o', linestyle='', markersize=9, alpha=0.7,
+               color=palette[i % len(palette)], label=defect_type)
+        for i, defect_type in enumerate(defect_types)
+    ]
 
     plt.xlabel('X Position')
     plt.ylabel('Y Position')
     plt.title('Spatial Defect Map')
     plt.grid(True, linestyle='--', alpha=0.3)
-    plt.legend(title='Defect Type')
+    plt.legend(handles=handles, title='Defect Type')
     plt.tight_layout()
     plt.savefig(output_path, dpi=300)
     plt.close()
@@ -11,7 +11,37 @@ Author: Josh Villanueva
 
 import pandas as pd
 import numpy as np
-import random
+
+# ============================================
+# Function: Generate test batch arrays
+# ============================================
+def _generate_batch_arrays(n=50, seed=42):
+    '''
+    Same data as generate_batch_data, as a dict of NumPy arrays (no DataFrame).
+
+    For tests or benchmarks that only need raw columns, e.g.
+    _generate_batch_arrays()['final_yield'].mean().
+    '''
+    rng = np.random.default_rng(seed)
+
+    # Zero-padded IDs B001, B002, ... as one array operation, and the dates as a
+    # datetime64 array (no Python list of Timestamps)
+    dates = pd.date_range(end=pd.Timestamp.today(), periods=n).to_numpy()
+    batch_ids = np.char.add('B', np.char.zfill(np.arange(1, n + 1).astype(str), 3))
+
+    # One draw for all three features, shifted/scaled per column: component_A, avg_pH, final_yield.
+    # float32 holds ~7 significant digits, well past what these readings carry, at half the bytes.
+    loc = np.array([1.2, 7.0, 0.91], dtype=np.float32)
+    scale = np.array([0.1, 0.15, 0.04], dtype=np.float32)
+    values = rng.standard_normal((n, 3), dtype=np.float32) * scale + loc
+
+    return {
+        'batch_id': batch_ids,
+        'date': dates,
+        'component_A': values[:, 0],
+        'avg_pH': values[:, 1],
+        'final_yield': values[:, 2]
+    }
 
 # ============================================
 # Function: Generate test batch data
@@ -27,20 +57,8 @@ def generate_batch_data(n=50, seed=42):
     Returns:
     - pd.DataFrame: DataFrame with process inputs and outcome
     '''
-    np.random.seed(seed)
-    random.seed(seed)
-
-    dates = pd.date_range(end=pd.Timestamp.today(), periods=n).to_list()
-    batch_ids = [f"B{i+1:03d}" for i in range(n)]
-
-    df = pd.DataFrame({
-        'batch_id': batch_ids,
-        'date': dates,
-        'component_A': np.random.normal(1.2, 0.1, size=n),
-        'avg_pH': np.random.normal(7.0, 0.15, size=n),
-        'final_yield': np.random.normal(0.91, 0.04, size=n)
-    })
-    return df
+    # pandas consolidates the three float32 feature columns into one block
+    return pd.DataFrame(_generate_batch_arrays(n, seed))
 
 # ============================================
 # Function: Generate test defect map data
@@ -56,14 +74,20 @@ def generate_defect_data(n=200, seed=24):
     Returns:
     - pd.DataFrame: DataFrame with x, y, type, and severity
     '''
-    np.random.seed(seed)
+    rng = np.random.default_rng(seed)
     types = ['scratch', 'particle', 'void', 'contamination']
-    df = pd.DataFrame({
-        'x': np.random.uniform(0, 100, n),
-        'y': np.random.uniform(0, 100, n),
-        'type': np.random.choice(types, n),
-        'severity': np.random.randint(1, 6, n)
-    })
+
+    # Both coordinates in one (n, 2) float32 draw in [0, 100), kept as one contiguous block
+    # in the frame (uniform() has no dtype option, so scale a float32 random() draw)
+    xy = rng.random((n, 2), dtype=np.float32) * np.float32(100)
+
+    # Draw small integer codes and wrap them as a Categorical: one byte per defect
+    # instead of one Python string each, and groupby/value_counts run on the codes
+    type_codes = rng.integers(0, len(types), size=n, dtype=np.int8)
+
+    df = pd.DataFrame(xy, columns=['x', 'y'])
+    df['type'] = pd.Categorical.from_codes(type_codes, categories=types)
+    df['severity'] = rng.integers(1, 6, size=n, dtype=np.int8)  # 1-5 fits in int8
     return df
 
 # ============================================
@@ -0,0 +1,55 @@
+'''
+compute_outlier_stats.py
+
+Compute the summary statistics used by both outlier detection templates in one pass.
+
+Pass the result as stats= to detect_outliers_zscore and detect_outliers_iqr when
+running both on the same column, so the mean/std and quartiles are computed once.
+
+Author: Josh Villanueva
+'''
+
+import numpy as np
+import pandas as pd
+
+# ============================================
+# Function: Compute shared outlier statistics
+# ============================================
+def compute_outlier_stats(data):
+    '''
+    Compute mean, standard deviation, and quartiles for outlier detection.
+
+    Parameters:
+    - data (pd.Series): Numeric values
+
+    Returns:
+    - dict: Summary statistics (mean, std, Q1, Q3); NaN values are ignored
+    '''
+    # Drop NaNs once; every statistic below works on the same clean array
+    values = data.to_numpy(dtype=np.float64)
+    values = values[~np.isnan(values)]
+    n = values.size
+    if n == 0:
+        # Nothing left after dropping NaN: all four stats are NaN
+        return dict.fromkeys(['mean', 'std', 'Q1', 'Q3'], np.nan)
+
+    # Both quartiles from one call sharing one partition (linear interpolation)
+    Q1, Q3 = np.quantile(values, (0.25, 0.75))
+
+    stats = {
+        'mean': values.mean(),
+        'std': values.std(ddof=1) if n > 1 else np.nan,  # ddof=1; a single value has no spread estimate
+        'Q1': Q1,
+        'Q3': Q3
+    }
+    return stats
+
+# ============================================
+# Optional Test Block
+# ============================================
+if __name__ == '__main__':
+    sample_data = pd.Series([1.0, 1.1, 1.2, 10.0, 1.1, 1.2])
+    stats = compute_outlier_stats(sample_data)
+    print("Outlier Stats:")
+    for k, v in stats.items():
+        print(f"  {k}: {v:.3f}")
@@ -9,6 +9,7 @@ Useful for early trend monitoring, deviation detection, or baseline stability.
 Author: Josh Villanueva
 '''
 
+import numpy as np
 import pandas as pd
 
 # ============================================
@@ -19,26 +20,61 @@ def compute_spc_metrics(data):
     Compute mean, standard deviation, and control limits.
 
     Parameters:
-    - data (pd.Series): Numeric values (e.g., yield, thickness)
+    - data (pd.Series): Numeric values (e.g., yield, thickness); float32 or float64
 
     Returns:
     - dict: Summary statistics (mean, std, UCL, LCL, min, max)
     '''
-    mean = data.mean()
-    std = data.std()
+    # NaNs are dropped once up front, so every statistic below ignores missing readings.
+    # float32 input is widened to float64 so the sums accumulate in double precision.
+    values = data.to_numpy(dtype=np.float64)
+    values = values[~np.isnan(values)]
+    n = values.size
+    if n == 0:
+        # No readings left: report every statistic as NaN rather than raising
+        return dict.fromkeys(['mean', 'std', 'min', 'max', 'UCL', 'LCL'], np.nan)
+
+    mean = values.mean()
+    # Sum of squared deviations as one dot product (no squared temporary); this stays
+    # accurate where the one-pass sum-of-squares formula would cancel
+    dev = values - mean
+    std = np.sqrt(dev @ dev / (n - 1)) if n > 1 else np.nan  # Sample std (n - 1 denominator); undefined for one value
     ucl = mean + 3 * std
     lcl = mean - 3 * std
 
     stats = {
         'mean': mean,
         'std': std,
-        'min': data.min(),
-        'max': data.max(),
+        'min': values.min(),
+        'max': values.max(),
         'UCL': ucl,
         'LCL': lcl
     }
     return stats
 
+# ============================================
+# Function: Compute SPC statistics for several columns at once
+# ============================================
+def compute_spc_metrics_batch(df, cols):
+    '''
+    Compute the same SPC metrics for many columns in one table.
+
+    Use instead of looping compute_spc_metrics over columns and collecting the
+    dicts row by row; the reductions run once over all columns together.
+
+    Parameters:
+    - df (pd.DataFrame): Data containing the metric columns
+    - cols (list): Numeric columns to summarize
+
+    Returns:
+    - pd.DataFrame: One column per metric column, rows mean, std, min, max, UCL, LCL
+    '''
+    stats = df[cols].agg(['mean', 'std', 'min', 'max'])  # std is sample std (ddof=1)
+    mean, std = stats.loc['mean'], stats.loc['std']
+    stats.loc['UCL'] = mean + 3 * std
+    stats.loc['LCL'] = mean - 3 * std
+    return stats
+
 # ============================================
 # Optional Test Block
 # ============================================
@@ -49,3 +85,11 @@ if __name__ == '__main__':
     print("SPC Metrics:")
     for k, v in stats.items():
         print(f"  {k}: {v:.3f}")
+
+    # Several metrics from the same run in one call
+    sample_df = pd.DataFrame({
+        'thickness_nm': [1.1, 1.2, 1.0, 1.3, 1.1, 1.4],
+        'yield_pct': [91.0, 92.5, 90.8, 93.1, 91.7, 92.2]
+    })
+    print("SPC Metrics (batch):")
+    print(compute_spc_metrics_batch(sample_df, ['thickness_nm', 'yield_pct']).round(3))
@@ -9,28 +9,42 @@ of the data and is more robust to skewed distributions.
 Author: Josh Villanueva
 '''
 
+import numpy as np
 import pandas as pd
 
 # ============================================
 # Function: Detect outliers using IQR
 # ============================================
-def detect_outliers_iqr(data, threshold=1.5):
+def detect_outliers_iqr(data, threshold=1.5, stats=None):
     '''
     Identify outliers using the IQR rule.
 
     Parameters:
     - data (pd.Series): Numeric values
     - threshold (float): Multiplier for IQR to set boundary
+    - stats (dict): Precomputed 'Q1' and 'Q3' (e.g., from compute_outlier_stats) to reuse
+                    instead of recomputing them (optional)
 
     Returns:
     - pd.Series (bool): True where value is an outlier
     '''
-    Q1 = data.quantile(0.25)
-    Q3 = data.quantile(0.75)
+    values = data.to_numpy(dtype=np.float64)
+
+    if stats is None:
+        if np.isnan(values).all():
+            # Empty or all-NaN: the quartiles are undefined and nothing is flagged
+            return pd.Series(False, index=data.index)
+
+        # One call computes both quartiles from a shared partition of the array.
+        # nanquantile ignores NaN entries; the plain call is used when there are none, as it is faster.
+        quantile = np.nanquantile if np.isnan(values).any() else np.quantile
+        Q1, Q3 = quantile(values, (0.25, 0.75))
+    else:
+        Q1, Q3 = stats['Q1'], stats['Q3']
     IQR = Q3 - Q1
     lower_bound = Q1 - threshold * IQR
     upper_bound = Q3 + threshold * IQR
-    return (data < lower_bound) | (data > upper_bound)
+    return pd.Series((values < lower_bound) | (values > upper_bound), index=data.index)
 
 # ============================================
 # Optional Test Block
@@ -9,24 +9,43 @@ that deviate significantly from a population mean.
 Author: Josh Villanueva
 '''
 
+import numpy as np
 import pandas as pd
 
 # ============================================
 # Function: Detect outliers using Z-score
 # ============================================
-def detect_outliers_zscore(data, threshold=3.0):
+def detect_outliers_zscore(data, threshold=3.0, stats=None):
     '''
     Identify outliers based on standard deviation threshold.
 
     Parameters:
     - data (pd.Series): Numeric values
     - threshold (float): Number of standard deviations to define outlier
+    - stats (dict): Precomputed 'mean' and 'std' (e.g., from compute_outlier_stats) to reuse
+                    instead of recomputing them (optional)
 
     Returns:
     - pd.Series (bool): True where value is an outlier
     '''
-    z_scores = (data - data.mean()) / data.std()
-    return abs(z_scores) > threshold
+    values = data.to_numpy(dtype=np.float64)
+
+    if stats is None:
+        # mean/std come from the non-NaN values only; NaN rows compare False below
+        valid = values[~np.isnan(values)]
+        if valid.size < 2:
+            # Under two values the sample std is undefined, so nothing is flagged
+            return pd.Series(False, index=data.index)
+        mean, std = valid.mean(), valid.std(ddof=1)
+    else:
+        mean, std = stats['mean'], stats['std']
+
+    # |x - mean| > threshold * std is |z| > threshold, without the divide; squaring
+    # both sides drops the abs as well. One buffer holds the squared deviations.
+    dev = np.subtract(values, mean)
+    np.square(dev, out=dev)
+    limit = threshold * std
+    return pd.Series(dev > limit * limit, index=data.index)
 
 # ============================================
 # Optional Test Block
@@ -9,36 +9,126 @@ and certificate metadata in manufacturing or MSAT data pipelines.
 Author: Josh Villanueva
 '''
 
+import logging
+
 import pandas as pd
 
+logger = logging.getLogger(__name__)
+
+# ============================================
+# Class: Reusable QC/COA lookup for many batch merges
+# ============================================
+class MergeContext:
+    '''
+    Hold QC and COA tables indexed by their keys so repeated merges reuse them.
+
+    Build one context and call merge() for each incoming batch frame; the key
+    indexes (and their hash tables) are built once instead of on every merge.
+
+    Parameters:
+    - qc_df (pd.DataFrame): QC test results (e.g., viability, yield)
+    - coa_df (pd.DataFrame): COA metadata by supplier lot
+    - validate (bool): Check that batch_id is unique in each batch frame and in qc_df, and
+                       supplier_lot is unique in coa_df (set False to skip the checks)
+    '''
+    def __init__(self, qc_df, coa_df, validate=True):
+        self.qc = qc_df.set_index('batch_id')
+        self.coa = coa_df.set_index('supplier_lot')
+        self.validate = validate
+        # Right-side facts that do not depend on the batch frame, checked once
+        self._unique_keys = self.qc.index.is_unique and self.coa.index.is_unique
+        self._qc_cols = set(self.qc.columns)
+        self._coa_cols = set(self.coa.columns)
+
+    def _can_use_row_lookup(self, batch_df):
+        '''
+        True when every batch maps to at most one QC row and one COA row, the key
+        dtypes match, and no column names clash, so the merge can be done by row
+        position lookups.
+        '''
+        if not self._unique_keys:
+            return False
+        if (batch_df['batch_id'].dtype != self.qc.index.dtype
+                or batch_df['supplier_lot'].dtype != self.coa.index.dtype):
+            # A lookup would just miss every key (e.g. int vs str IDs); join coerces
+            # compatible types and raises on incompatible ones
+            return False
+        if self.validate and not batch_df['batch_id'].is_unique:
+            return False  # Let join raise its one_to_one error
+        batch_cols = set(batch_df.columns)
+        return not (batch_cols & self._qc_cols or (batch_cols | self._qc_cols) & self._coa_cols)
+
+    def merge(self, batch_df):
+        '''
+        Join one batch frame with the QC (inner) and COA (left) tables.
+
+        Parameters:
+        - batch_df (pd.DataFrame): Batch metadata and input features
+
+        Returns:
+        - pd.DataFrame: Merged full dataset (raises on key or column errors)
+        '''
+        qc, coa = self.qc, self.coa
+
+        if not self._can_use_row_lookup(batch_df):
+            # Repeat keys or clashing column names: DataFrame.join handles (or rejects) them.
+            # validate= raises on repeat keys instead of silently multiplying rows, and
+            # shared non-key columns get pd.merge's default _x/_y suffixes.
+            df = batch_df.join(qc, on='batch_id', how='inner', lsuffix='_x', rsuffix='_y',
+                               validate='one_to_one' if self.validate else None)
+            df = df.join(coa, on='supplier_lot', how='left', lsuffix='_x', rsuffix='_y',
+                         validate='many_to_one' if self.validate else None)
+            return df.reset_index(drop=True)  # Fresh 0..n-1 index, as pd.merge returned
+
+        # Map each batch to its QC row position in one pass (-1 = no QC result,
+        # dropped as an inner join would), then gather the matching rows directly
+        qc_pos = qc.index.get_indexer(batch_df['batch_id'])
+        has_qc = qc_pos >= 0
+        df = batch_df[has_qc].reset_index(drop=True)
+
+        # One concat of the three aligned pieces instead of two intermediate merges;
+        # lots with no COA get NaN, as a left join would
+        return pd.concat([
+            df,
+            qc.take(qc_pos[has_qc]).reset_index(drop=True),
+            coa.reindex(df['supplier_lot']).reset_index(drop=True)
+        ], axis=1)
+
 # ============================================
 # Function: Merge batch, QC, and COA datasets
 # ============================================
-def merge_batch_and_qc(batch_df, qc_df, coa_df):
+def merge_batch_and_qc(batch_df, qc_df, coa_df, validate=True):
     '''
     Join batch log with QC and COA data using shared keys.
 
+    For many batch frames against the same QC/COA tables, build a MergeContext
+    once and call its merge() instead.
+
     Parameters:
     - batch_df (pd.DataFrame): Batch metadata and input features
     - qc_df (pd.DataFrame): QC test results (e.g., viability, yield)
     - coa_df (pd.DataFrame): COA metadata by supplier lot
+    - validate (bool): Check that batch_id is unique in batch_df and qc_df, and
+                       supplier_lot is unique in coa_df (set False to skip the checks)
 
     Returns:
     - pd.DataFrame: Merged full dataset
+
+    Raises:
+    - KeyError / pd.errors.MergeError: Missing key columns or repeat keys
+      (errors propagate so pipelines fail loudly instead of continuing on an empty frame)
     '''
-    try:
-        df = pd.merge(batch_df, qc_df, on='batch_id', how='inner')
-        df = pd.merge(df, coa_df, on='supplier_lot', how='left')
-        print(f"Merged dataset shape: {df.shape}")
-        return df
-    except Exception as e:
-        print(f"Merge error: {e}")
-        return pd.DataFrame()
+    df = MergeContext(qc_df, coa_df, validate=validate).merge(batch_df)
+    # Debug-level log, not print: no stdout writes per merge in batch pipelines
+    logger.debug("Merged dataset shape: %s", df.shape)
+    return df
 
 # ============================================
 # Optional Test Block
 # ============================================
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG)  # Show the merge shape log line
+
     # Dummy example DataFrames for testing merge
     batch_df = pd.DataFrame({'batch_id': [1, 2], 'supplier_lot': ['A', 'B']})
     qc_df = pd.DataFrame({'batch_id': [1, 2], 'viability_pct': [0.92, 0.85]})
@@ -46,3 +136,8 @@ if __name__ == '__main__':
 
     merged = merge_batch_and_qc(batch_df, qc_df, coa_df)
     print(merged)
+
+    # Same lookup tables, several batch frames: index QC/COA once and reuse
+    context = MergeContext(qc_df, coa_df)
+    for chunk in (batch_df.iloc[:1], batch_df.iloc[1:]):
+        print(context.merge(chunk))